@@ -6,10 +6,15 @@ from typing import Any
 
 import aiohttp
 
-from homeassistant.config_entries import ConfigEntry
-from homeassistant.const import CONF_PASSWORD, CONF_USERNAME, Platform
-from homeassistant.core import HomeAssistant
-from homeassistant.helpers.aiohttp_client import async_get_clientsession
+from homeassistant.config_entries import ConfigEntry, ConfigEntryState
+from homeassistant.const import (
+    CONF_PASSWORD,
+    CONF_USERNAME,
+    EVENT_HOMEASSISTANT_CLOSE,
+    Platform,
+)
+from homeassistant.core import Event, HomeAssistant
+from homeassistant.util import ssl as ssl_util
 
 from .api import VeluxActiveApi, VeluxActiveAuthError, VeluxActiveConnectionError
 from .const import (
@@ -25,6 +30,41 @@ _LOGGER = logging.getLogger(__name__)
 
 PLATFORMS: list[Platform] = [Platform.COVER, Platform.SENSOR, Platform.SWITCH, Platform.BINARY_SENSOR]
 
+DATA_SESSION = "_session"
+DATA_SESSION_UNSUB = "_session_unsub"
+
+
+def _async_get_session(hass: HomeAssistant) -> aiohttp.ClientSession:
+    """Return the integration-wide client session, creating it on first use.
+
+    A dedicated connector keeps Velux traffic off Home Assistant's shared
+    pool so polls and cover commands reuse warm keep-alive connections.
+    """
+    domain_data: dict[str, Any] = hass.data.setdefault(DOMAIN, {})
+    if (session := domain_data.get(DATA_SESSION)) is None:
+        session = domain_data[DATA_SESSION] = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(
+                limit=8,
+                limit_per_host=4,
+                keepalive_timeout=75,
+                ttl_dns_cache=300,
+                ssl=ssl_util.get_default_context(),
+            )
+        )
+
+        async def _async_close_session(_: Event) -> None:
+            """Close the session when Home Assistant stops.
+
+            Config entries are not unloaded on shutdown, so the unload path
+            alone would leave the session and its connector open.
+            """
+            await session.close()
+
+        domain_data[DATA_SESSION_UNSUB] = hass.bus.async_listen_once(
+            EVENT_HOMEASSISTANT_CLOSE, _async_close_session
+        )
+    return session
+
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Set up Velux ACTIVE from a config entry."""
@@ -33,7 +73,7 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     client_id: str = entry.data.get(CONF_CLIENT_ID, DEFAULT_CLIENT_ID)
     client_secret: str = entry.data.get(CONF_CLIENT_SECRET, DEFAULT_CLIENT_SECRET)
 
-    session = async_get_clientsession(hass)
+    session = _async_get_session(hass)
     api = VeluxActiveApi(session, username, password, client_id, client_secret)
 
     # Restore cached tokens if available
@@ -49,7 +89,7 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
 
     await coordinator.async_config_entry_first_refresh()
 
-    hass.data.setdefault(DOMAIN, {})[entry.entry_id] = coordinator
+    entry.runtime_data = coordinator
 
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
 
@@ -59,5 +99,18 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Unload a config entry."""
     if unload_ok := await hass.config_entries.async_unload_platforms(entry, PLATFORMS):
-        hass.data[DOMAIN].pop(entry.entry_id)
+        # The coordinator's own shutdown only runs after this returns, which
+        # is too late for commands still queued on the shared session
+        await entry.runtime_data.async_shutdown()
+        if not any(
+            other.state is ConfigEntryState.LOADED
+            for other in hass.config_entries.async_entries(DOMAIN)
+            if other.entry_id != entry.entry_id
+        ):
+            # Last entry unloaded – release the pooled connections
+            domain_data: dict[str, Any] = hass.data.get(DOMAIN, {})
+            if (unsub := domain_data.pop(DATA_SESSION_UNSUB, None)) is not None:
+                unsub()
+            if (session := domain_data.pop(DATA_SESSION, None)) is not None:
+                await session.close()
     return unload_ok
@@ -1,10 +1,19 @@
-"""Velux ACTIVE API client."""
+"""Velux ACTIVE API client.
+
+The client never creates or closes an aiohttp session: the caller injects one
+and owns its lifetime, so every request shares the caller's keep-alive pool.
+"""
 from __future__ import annotations
 
+import asyncio
 import time
-from typing import Any
+from collections.abc import Awaitable, Callable
+from typing import Any, TypeVar
+from urllib.parse import urlencode
 
 import aiohttp
+import orjson
+from multidict import CIMultiDict
 
 from .const import (
     AUTH_URL,
@@ -13,8 +22,11 @@ from .const import (
     SET_STATE_URL,
     SET_PERSONS_AWAY_URL,
     SET_PERSONS_HOME_URL,
+    SET_STATE_BATCH_DELAY,
 )
 
+_T = TypeVar("_T")
+
 
 class VeluxActiveAuthError(Exception):
     """Authentication error."""
@@ -35,7 +47,7 @@ class VeluxActiveApi:
         client_id: str,
         client_secret: str,
     ) -> None:
-        """Initialize the API client."""
+        """Initialize the API client with a caller-owned session."""
         self._session = session
         self._username = username
         self._password = password
@@ -44,6 +56,30 @@ class VeluxActiveApi:
         self._access_token: str | None = None
         self._refresh_token: str | None = None
         self._token_expires_at: float = 0.0
+        self._tokens_dirty = False
+        self._refresh_lock = asyncio.Lock()
+        # Per home: queued module updates keyed by module id, and their future
+        self._pending_set_state: dict[
+            str, tuple[dict[str, dict[str, Any]], asyncio.Future[None]]
+        ] = {}
+        self._flush_handle: asyncio.TimerHandle | None = None
+        self._set_state_tasks: set[asyncio.Task[None]] = set()
+        self._form_headers: CIMultiDict[str] = CIMultiDict(
+            {"Content-Type": "application/x-www-form-urlencoded"}
+        )
+        self._bearer_headers: CIMultiDict[str] = CIMultiDict()
+        self._access_token_body = b""
+        # The password grant body never changes, so encode it only once
+        self._auth_body = urlencode(
+            {
+                "grant_type": "password",
+                "client_id": client_id,
+                "client_secret": client_secret,
+                "username": username,
+                "password": password,
+                "user_prefix": "velux",
+            }
+        ).encode()
 
     @property
     def access_token(self) -> str | None:
@@ -60,6 +96,15 @@ class VeluxActiveApi:
         """Return the token expiry timestamp."""
         return self._token_expires_at
 
+    @property
+    def tokens_dirty(self) -> bool:
+        """Return True if the tokens changed since they were last persisted."""
+        return self._tokens_dirty
+
+    def mark_tokens_persisted(self) -> None:
+        """Record that the current tokens have been persisted."""
+        self._tokens_dirty = False
+
     def restore_tokens(
         self,
         access_token: str,
@@ -67,9 +112,30 @@ class VeluxActiveApi:
         token_expires_at: float,
     ) -> None:
         """Restore tokens from stored data."""
+        self._set_tokens(access_token, refresh_token, token_expires_at)
+        self._tokens_dirty = False
+        if time.time() >= token_expires_at - 30:
+            # Only the refresh token is still useful after an expired restore
+            self._access_token = None
+
+    def _set_tokens(
+        self,
+        access_token: str,
+        refresh_token: str,
+        token_expires_at: float,
+    ) -> None:
+        """Store new tokens and rebuild the request templates that embed them."""
         self._access_token = access_token
         self._refresh_token = refresh_token
         self._token_expires_at = token_expires_at
+        self._tokens_dirty = True
+        self._bearer_headers = CIMultiDict(
+            {
+                "Content-Type": "application/json; charset=utf-8",
+                "Authorization": f"Bearer {access_token}",
+            }
+        )
+        self._access_token_body = urlencode({"access_token": access_token}).encode()
 
     def _is_token_valid(self) -> bool:
         """Return True if the access token is still valid."""
@@ -83,31 +149,31 @@ class VeluxActiveApi:
         try:
             async with self._session.post(
                 AUTH_URL,
-                data={
-                    "grant_type": "password",
-                    "client_id": self._client_id,
-                    "client_secret": self._client_secret,
-                    "username": self._username,
-                    "password": self._password,
-                    "user_prefix": "velux",
-                },
-                headers={"Content-Type": "application/x-www-form-urlencoded"},
+                data=self._auth_body,
+                headers=self._form_headers,
+                raise_for_status=True,
             ) as resp:
-                if resp.status == 401:
-                    raise VeluxActiveAuthError("Invalid credentials")
-                if not resp.ok:
-                    raise VeluxActiveConnectionError(
-                        f"Authentication failed with status {resp.status}"
-                    )
-                data: dict[str, Any] = await resp.json()
+                data: dict[str, Any] = orjson.loads(await resp.read())
+        except aiohttp.ClientResponseError as err:
+            if err.status == 401:
+                raise VeluxActiveAuthError("Invalid credentials") from err
+            raise VeluxActiveConnectionError(
+                f"Authentication failed with status {err.status}"
+            ) from err
         except aiohttp.ClientError as err:
             raise VeluxActiveConnectionError(
                 f"Cannot connect to Velux ACTIVE: {err}"
             ) from err
+        except orjson.JSONDecodeError as err:
+            raise VeluxActiveConnectionError(
+                f"Invalid token response: {err}"
+            ) from err
 
-        self._access_token = data["access_token"]
-        self._refresh_token = data["refresh_token"]
-        self._token_expires_at = time.time() + data.get("expires_in", 10800)
+        self._set_tokens(
+            data["access_token"],
+            data["refresh_token"],
+            time.time() + data.get("expires_in", 10800),
+        )
         return data
 
     async def async_refresh_token(self) -> None:
@@ -118,182 +184,285 @@ class VeluxActiveApi:
         try:
             async with self._session.post(
                 AUTH_URL,
-                data={
-                    "grant_type": "refresh_token",
-                    "refresh_token": self._refresh_token,
-                    "client_id": self._client_id,
-                    "client_secret": self._client_secret,
-                },
-                headers={"Content-Type": "application/x-www-form-urlencoded"},
+                data=urlencode(
+                    {
+                        "grant_type": "refresh_token",
+                        "refresh_token": self._refresh_token,
+                        "client_id": self._client_id,
+                        "client_secret": self._client_secret,
+                    }
+                ).encode(),
+                headers=self._form_headers,
+                raise_for_status=True,
             ) as resp:
-                if resp.status in (400, 401):
-                    # Refresh token expired – fall back to password grant
-                    await self.async_authenticate()
-                    return
-                if not resp.ok:
-                    raise VeluxActiveConnectionError(
-                        f"Token refresh failed with status {resp.status}"
-                    )
-                data: dict[str, Any] = await resp.json()
+                data: dict[str, Any] = orjson.loads(await resp.read())
+        except aiohttp.ClientResponseError as err:
+            if err.status in (400, 401):
+                # Refresh token expired – fall back to password grant
+                await self.async_authenticate()
+                return
+            raise VeluxActiveConnectionError(
+                f"Token refresh failed with status {err.status}"
+            ) from err
         except aiohttp.ClientError as err:
             raise VeluxActiveConnectionError(
                 f"Cannot connect to Velux ACTIVE: {err}"
             ) from err
+        except orjson.JSONDecodeError as err:
+            raise VeluxActiveConnectionError(
+                f"Invalid token response: {err}"
+            ) from err
 
-        self._access_token = data["access_token"]
-        self._refresh_token = data["refresh_token"]
-        self._token_expires_at = time.time() + data.get("expires_in", 10800)
+        self._set_tokens(
+            data["access_token"],
+            data["refresh_token"],
+            time.time() + data.get("expires_in", 10800),
+        )
 
     async def _ensure_token(self) -> None:
         """Ensure we have a valid access token."""
-        if not self._is_token_valid():
+        if self._is_token_valid():
+            return
+        async with self._refresh_lock:
+            # Another caller may have refreshed while we waited for the lock
+            if self._is_token_valid():
+                return
             await self.async_refresh_token()
 
+    async def _async_retry_rejected_token(
+        self, request: Callable[[], Awaitable[_T]]
+    ) -> _T:
+        """Await request, replacing the access token once if it is rejected.
+
+        A token that looks valid locally can still be refused: it may have been
+        revoked, or the stored expiry may be wrong after a clock change or a
+        long suspend. Without a reauth flow such a token would fail every poll
+        until restart, so drop it and retry once. A token obtained for this
+        very call is not retried, as the denial is then genuine.
+        """
+        if not self._is_token_valid():
+            return await request()
+        token = self._access_token
+        try:
+            return await request()
+        except VeluxActiveAuthError:
+            # A concurrent caller may already have replaced the token
+            if self._access_token == token:
+                self._access_token = None
+            return await request()
+
     async def async_get_homes_data(self) -> dict[str, Any]:
         """Fetch homes and modules data."""
+        return await self._async_retry_rejected_token(
+            self._async_get_homes_data_once
+        )
+
+    async def _async_get_homes_data_once(self) -> dict[str, Any]:
+        """Fetch homes and modules data with the current access token."""
         await self._ensure_token()
         try:
             async with self._session.post(
                 HOMES_DATA_URL,
-                data={"access_token": self._access_token},
-                headers={"Content-Type": "application/x-www-form-urlencoded"},
+                data=self._access_token_body,
+                headers=self._form_headers,
+                raise_for_status=True,
             ) as resp:
-                if resp.status == 403:
-                    raise VeluxActiveAuthError("Access denied")
-                if not resp.ok:
-                    raise VeluxActiveConnectionError(
-                        f"Failed to get homes data: {resp.status}"
-                    )
-                return await resp.json()
+                return await resp.json(loads=orjson.loads)
+        except aiohttp.ClientResponseError as err:
+            if err.status in (401, 403):
+                raise VeluxActiveAuthError("Access denied") from err
+            raise VeluxActiveConnectionError(
+                f"Failed to get homes data: {err.status}"
+            ) from err
         except aiohttp.ClientError as err:
             raise VeluxActiveConnectionError(
                 f"Cannot connect to Velux ACTIVE: {err}"
             ) from err
+        except orjson.JSONDecodeError as err:
+            raise VeluxActiveConnectionError(
+                f"Invalid homes data response: {err}"
+            ) from err
 
     async def async_get_home_status(self, home_id: str) -> dict[str, Any]:
         """Fetch the current status of a home."""
+        return await self._async_retry_rejected_token(
+            lambda: self._async_get_home_status_once(home_id)
+        )
+
+    async def _async_get_home_status_once(self, home_id: str) -> dict[str, Any]:
+        """Fetch the current status of a home with the current access token."""
         await self._ensure_token()
         try:
             async with self._session.post(
                 HOME_STATUS_URL,
-                json={"home_id": home_id},
-                headers={"Authorization": f"Bearer {self._access_token}"},
+                data=orjson.dumps({"home_id": home_id}),
+                headers=self._bearer_headers,
+                raise_for_status=True,
             ) as resp:
-                if resp.status == 403:
-                    raise VeluxActiveAuthError("Access denied")
-                if not resp.ok:
-                    raise VeluxActiveConnectionError(
-                        f"Failed to get home status: {resp.status}"
-                    )
-                return await resp.json()
+                return await resp.json(loads=orjson.loads)
+        except aiohttp.ClientResponseError as err:
+            if err.status in (401, 403):
+                raise VeluxActiveAuthError("Access denied") from err
+            raise VeluxActiveConnectionError(
+                f"Failed to get home status: {err.status}"
+            ) from err
         except aiohttp.ClientError as err:
             raise VeluxActiveConnectionError(
                 f"Cannot connect to Velux ACTIVE: {err}"
             ) from err
+        except orjson.JSONDecodeError as err:
+            raise VeluxActiveConnectionError(
+                f"Invalid home status response: {err}"
+            ) from err
 
     async def async_set_cover_position(
         self, home_id: str, bridge_id: str, module_id: str, position: int
     ) -> None:
         """Set the target position of a cover module (0–100)."""
-        await self._ensure_token()
-        payload = {
-            "home": {
-                "id": home_id,
-                "modules": [
-                    {
-                        "bridge": bridge_id,
-                        "id": module_id,
-                        "target_position": position,
-                    }
-                ],
-            }
-        }
-        try:
-            async with self._session.post(
-                SET_STATE_URL,
-                json=payload,
-                headers={
-                    "Content-Type": "application/json; charset=utf-8",
-                    "Authorization": f"Bearer {self._access_token}",
-                },
-            ) as resp:
-                if resp.status == 403:
-                    raise VeluxActiveAuthError("Access denied")
-                if not resp.ok:
-                    raise VeluxActiveConnectionError(
-                        f"Failed to set cover position: {resp.status}"
-                    )
-        except aiohttp.ClientError as err:
-            raise VeluxActiveConnectionError(
-                f"Cannot connect to Velux ACTIVE: {err}"
-            ) from err
+        await self._async_queue_set_state(
+            home_id,
+            {
+                "bridge": bridge_id,
+                "id": module_id,
+                "target_position": position,
+            },
+        )
 
     async def async_set_silent_mode(
         self, home_id: str, bridge_id: str, module_id: str, silent: bool
     ) -> None:
         """Set the silent mode of a module."""
-        await self._ensure_token()
-        payload = {
-            "home": {
-                "id": home_id,
-                "modules": [
-                    {
-                        "bridge": bridge_id,
-                        "id": module_id,
-                        "silent": silent,
-                    }
-                ],
-            }
-        }
-        try:
-            async with self._session.post(
-                SET_STATE_URL,
-                json=payload,
-                headers={
-                    "Content-Type": "application/json; charset=utf-8",
-                    "Authorization": f"Bearer {self._access_token}",
-                },
-            ) as resp:
-                if resp.status == 403:
-                    raise VeluxActiveAuthError("Access denied")
-                if not resp.ok:
-                    raise VeluxActiveConnectionError(
-                        f"Failed to set silent mode: {resp.status}"
-                    )
-        except aiohttp.ClientError as err:
-            raise VeluxActiveConnectionError(
-                f"Cannot connect to Velux ACTIVE: {err}"
-            ) from err
+        await self._async_queue_set_state(
+            home_id,
+            {
+                "bridge": bridge_id,
+                "id": module_id,
+                "silent": silent,
+            },
+        )
 
     async def async_stop_movements(self, home_id: str, bridge_id: str) -> None:
-        """Stop all movements on the given bridge."""
+        """Stop all movements on the given bridge.
+
+        Commands still queued or in flight are sent first, so the stop cannot
+        overtake an open or close issued just before it.
+        """
+        if (batch := self._pending_set_state.pop(home_id, None)) is not None:
+            self._start_send_set_state(home_id, *batch)
+            if not self._pending_set_state and self._flush_handle is not None:
+                self._flush_handle.cancel()
+                self._flush_handle = None
+        if self._set_state_tasks:
+            await asyncio.wait(tuple(self._set_state_tasks))
+        await self._async_post_set_state(
+            home_id, [{"id": bridge_id, "stop_movements": "all"}]
+        )
+
+    async def async_close(self) -> None:
+        """Drop queued module updates and cancel the ones in flight.
+
+        Callers still waiting on a batch are failed with a connection error
+        so nothing is left pending once the session is closed.
+        """
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        pending, self._pending_set_state = self._pending_set_state, {}
+        for _modules, future in pending.values():
+            if not future.done():
+                future.set_exception(VeluxActiveConnectionError("Client closed"))
+        if tasks := tuple(self._set_state_tasks):
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _async_queue_set_state(
+        self, home_id: str, module: dict[str, Any]
+    ) -> None:
+        """Queue a module update and wait until its batch has been sent.
+
+        Updates arriving within SET_STATE_BATCH_DELAY (e.g. a scene moving
+        several covers) are combined into a single setstate request per home.
+        Repeated updates for one module are merged so the last write wins.
+        """
+        loop = asyncio.get_running_loop()
+        if (batch := self._pending_set_state.get(home_id)) is None:
+            batch = self._pending_set_state[home_id] = ({}, loop.create_future())
+        batch[0].setdefault(module["id"], {}).update(module)
+        if self._flush_handle is None:
+            self._flush_handle = loop.call_later(
+                SET_STATE_BATCH_DELAY, self._flush_set_state
+            )
+        await asyncio.shield(batch[1])
+
+    def _flush_set_state(self) -> None:
+        """Send all queued module updates, one request per home."""
+        self._flush_handle = None
+        pending, self._pending_set_state = self._pending_set_state, {}
+        for home_id, (modules, future) in pending.items():
+            self._start_send_set_state(home_id, modules, future)
+
+    def _start_send_set_state(
+        self,
+        home_id: str,
+        modules: dict[str, dict[str, Any]],
+        future: asyncio.Future[None],
+    ) -> None:
+        """Start sending a batch of module updates in the background."""
+        task = asyncio.create_task(
+            self._async_send_set_state(home_id, list(modules.values()), future)
+        )
+        self._set_state_tasks.add(task)
+        task.add_done_callback(self._set_state_tasks.discard)
+
+    async def _async_send_set_state(
+        self,
+        home_id: str,
+        modules: list[dict[str, Any]],
+        future: asyncio.Future[None],
+    ) -> None:
+        """Post a batch of module updates and resolve the waiting callers."""
+        try:
+            await self._async_post_set_state(home_id, modules)
+        except asyncio.CancelledError:
+            if not future.done():
+                future.set_exception(VeluxActiveConnectionError("Client closed"))
+            raise
+        except Exception as err:  # noqa: BLE001 – re-raised in every caller
+            future.set_exception(err)
+        else:
+            future.set_result(None)
+
+    async def _async_post_set_state(
+        self, home_id: str, modules: list[dict[str, Any]]
+    ) -> None:
+        """Post a setstate request for the given modules."""
+        await self._async_retry_rejected_token(
+            lambda: self._async_post_set_state_once(home_id, modules)
+        )
+
+    async def _async_post_set_state_once(
+        self, home_id: str, modules: list[dict[str, Any]]
+    ) -> None:
+        """Post a setstate request with the current access token."""
         await self._ensure_token()
-        payload = {
-            "home": {
-                "id": home_id,
-                "modules": [
-                    {
-                        "id": bridge_id,
-                        "stop_movements": "all",
-                    }
-                ],
-            }
-        }
+        payload = {"home": {"id": home_id, "modules": modules}}
         try:
             async with self._session.post(
                 SET_STATE_URL,
-                json=payload,
-                headers={
-                    "Content-Type": "application/json; charset=utf-8",
-                    "Authorization": f"Bearer {self._access_token}",
-                },
+                data=orjson.dumps(payload),
+                headers=self._bearer_headers,
+                raise_for_status=True,
             ) as resp:
-                if resp.status == 403:
-                    raise VeluxActiveAuthError("Access denied")
-                if not resp.ok:
-                    raise VeluxActiveConnectionError(
-                        f"Failed to stop movements: {resp.status}"
-                    )
+                # Drain the small body so the keep-alive connection is returned
+                # to the pool; aiohttp closes connections with unread payloads
+                await resp.read()
+        except aiohttp.ClientResponseError as err:
+            if err.status in (401, 403):
+                raise VeluxActiveAuthError("Access denied") from err
+            raise VeluxActiveConnectionError(
+                f"Failed to set state: {err.status}"
+            ) from err
         except aiohttp.ClientError as err:
             raise VeluxActiveConnectionError(
                 f"Cannot connect to Velux ACTIVE: {err}"
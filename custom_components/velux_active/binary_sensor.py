@@ -17,7 +17,7 @@ from homeassistant.helpers.device_registry import DeviceInfo
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
-from .const import DOMAIN, MODEL_MAP
+from .const import DOMAIN, MANUFACTURER, MODULE_TYPE_BRIDGE, MODEL_MAP
 from .coordinator import VeluxActiveCoordinator
 
 _LOGGER = logging.getLogger(__name__)
@@ -45,7 +45,7 @@ async def async_setup_entry(
     async_add_entities: AddEntitiesCallback,
 ) -> None:
     """Set up Velux ACTIVE binary sensor entities from a config entry."""
-    coordinator: VeluxActiveCoordinator = hass.data[DOMAIN][entry.entry_id]
+    coordinator: VeluxActiveCoordinator = entry.runtime_data
 
     entities: list[BinarySensorEntity] = []
 
@@ -76,28 +76,35 @@ class VeluxActiveModuleBinarySensor(
         super().__init__(coordinator)
         self._module_id: str = module["id"]
         self.entity_description = description
+        self._module_key = description.module_key
         self._attr_unique_id = f"{self._module_id}_{description.key}"
         self._attr_translation_key = description.key
         
         device_id = self._module_id
-        device_name = module.get("name", self._module_id)
-        
+        module_type = module.get("type", "Unknown")
+        is_bridge = module_type == MODULE_TYPE_BRIDGE
+
         # Pass through gateway name if this is the bridge
-        if module.get("type") == "NXG":
-            device_name = module.get("name", "Velux ACTIVE System")
-        
-        fw_ver = str(module.get("firmware_revision", module.get("firmware_revision_netatmo", "")))
+        device_name = module.get(
+            "name", "Velux ACTIVE System" if is_bridge else self._module_id
+        )
+
+        fw_ver = str(
+            module.get("firmware_revision")
+            or module.get("firmware_revision_netatmo")
+            or ""
+        )
         hw_ver = str(module.get("hardware_version", ""))
         
         connections = None
-        if ":" in self._module_id and module.get("type") == "NXG":
+        if is_bridge and ":" in self._module_id:
             connections = {(dr.CONNECTION_NETWORK_MAC, self._module_id)}
             
         self._attr_device_info = DeviceInfo(
             identifiers={(DOMAIN, device_id)},
             name=device_name,
-            manufacturer="Velux",
-            model=MODEL_MAP.get(module.get("type", "Unknown"), module.get("type", "Unknown")),
+            manufacturer=MANUFACTURER,
+            model=MODEL_MAP.get(module_type, module_type),
             sw_version=fw_ver if fw_ver else None,
             hw_version=hw_ver if hw_ver else None,
             connections=connections,
@@ -106,12 +113,11 @@ class VeluxActiveModuleBinarySensor(
     @property
     def _module(self) -> dict[str, Any]:
         """Return the current module status data."""
-        for module in self.coordinator.data.get("modules", []):
-            if module.get("id") == self._module_id:
-                return module
-        return {}
+        return self.coordinator.modules_by_id.get(self._module_id, {})
 
     @property
     def is_on(self) -> bool | None:
         """Return True if the binary sensor is on."""
-        return self._module.get(self.entity_description.module_key)
+        return self.coordinator.modules_by_id.get(self._module_id, {}).get(
+            self._module_key
+        )
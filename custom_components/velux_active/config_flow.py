@@ -51,6 +51,16 @@ STEP_ADVANCED_DATA_SCHEMA = vol.Schema(
     }
 )
 
+UPDATE_INTERVAL_VALIDATOR = vol.All(int, vol.Range(min=10, max=3600))
+
+OPTIONS_SCHEMA_TEMPLATE = vol.Schema(
+    {
+        vol.Optional(
+            "update_interval", default=UPDATE_INTERVAL
+        ): UPDATE_INTERVAL_VALIDATOR
+    }
+)
+
 
 class VeluxActiveConfigFlow(ConfigFlow, domain=DOMAIN):
     """Handle a config flow for Velux ACTIVE."""
@@ -65,6 +75,7 @@ class VeluxActiveConfigFlow(ConfigFlow, domain=DOMAIN):
         self._client_secret: str = DEFAULT_CLIENT_SECRET
         self._homes: list[dict[str, Any]] = []
         self._api: VeluxActiveApi | None = None
+        self._select_home_schema: vol.Schema | None = None
 
     async def async_step_user(
         self, user_input: dict[str, Any] | None = None
@@ -93,6 +104,7 @@ class VeluxActiveConfigFlow(ConfigFlow, domain=DOMAIN):
             else:
                 self._homes = homes
                 self._api = api
+                self._select_home_schema = None
                 if len(homes) == 1:
                     return await self._async_create_entry(homes[0])
                 return await self.async_step_select_home()
@@ -112,12 +124,14 @@ class VeluxActiveConfigFlow(ConfigFlow, domain=DOMAIN):
             home = next(h for h in self._homes if h["id"] == home_id)
             return await self._async_create_entry(home)
 
-        home_options = {h["id"]: h.get("name", h["id"]) for h in self._homes}
+        if self._select_home_schema is None:
+            home_options = {h["id"]: h.get("name", h["id"]) for h in self._homes}
+            self._select_home_schema = vol.Schema(
+                {vol.Required("home_id"): vol.In(home_options)}
+            )
         return self.async_show_form(
             step_id="select_home",
-            data_schema=vol.Schema(
-                {vol.Required("home_id"): vol.In(home_options)}
-            ),
+            data_schema=self._select_home_schema,
         )
 
     async def _async_create_entry(self, home: dict[str, Any]) -> ConfigFlowResult:
@@ -186,13 +200,14 @@ class VeluxActiveOptionsFlow(OptionsFlow):
         current_interval = self._config_entry.options.get(
             "update_interval", UPDATE_INTERVAL
         )
-        return self.async_show_form(
-            step_id="init",
-            data_schema=vol.Schema(
+        if current_interval == UPDATE_INTERVAL:
+            schema = OPTIONS_SCHEMA_TEMPLATE
+        else:
+            schema = vol.Schema(
                 {
-                    vol.Optional("update_interval", default=current_interval): vol.All(
-                        int, vol.Range(min=10, max=3600)
-                    )
+                    vol.Optional(
+                        "update_interval", default=current_interval
+                    ): UPDATE_INTERVAL_VALIDATOR
                 }
-            ),
-        )
+            )
+        return self.async_show_form(step_id="init", data_schema=schema)
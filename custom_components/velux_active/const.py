@@ -16,6 +16,8 @@ SET_STATE_URL = "https://app.velux-active.com/syncapi/v1/setstate"
 SET_PERSONS_AWAY_URL = "https://app.velux-active.com/api/setpersonsaway"
 SET_PERSONS_HOME_URL = "https://app.velux-active.com/api/setpersonshome"
 
+MANUFACTURER = "Velux"
+
 MODULE_TYPE_BRIDGE = "NXG"
 MODULE_TYPE_ROLLER_SHUTTER = "NXO"
 MODULE_TYPE_DEPARTURE_SWITCH = "NXD"
@@ -33,3 +35,6 @@ MODEL_MAP = {
 }
 
 UPDATE_INTERVAL = 60  # seconds
+SET_STATE_BATCH_DELAY = 0.05  # seconds
+TOKEN_PERSIST_DELAY = 5  # seconds
+NAMES_REFRESH_INTERVAL = 3600  # seconds
@@ -1,24 +1,76 @@
 """DataUpdateCoordinator for the Velux ACTIVE integration."""
 from __future__ import annotations
 
+import asyncio
 import logging
+import random
+import time
+from collections.abc import Awaitable, Callable
 from datetime import timedelta
-from typing import Any
+from typing import Any, TypeVar
+
+import aiohttp
 
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.exceptions import ConfigEntryAuthFailed
+from homeassistant.helpers.debounce import Debouncer
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
 
 from .api import VeluxActiveApi, VeluxActiveAuthError, VeluxActiveConnectionError
-from .const import DOMAIN, UPDATE_INTERVAL
+from .const import (
+    DOMAIN,
+    NAMES_REFRESH_INTERVAL,
+    TOKEN_PERSIST_DELAY,
+    UPDATE_INTERVAL,
+)
 
 _LOGGER = logging.getLogger(__name__)
 
+_T = TypeVar("_T")
+
+
+async def _call_with_retry(
+    coro_factory: Callable[[], Awaitable[_T]],
+    attempts: int = 3,
+    base: float = 0.5,
+    cap: float = 5.0,
+) -> _T:
+    """Await coro_factory, retrying transient errors with jittered backoff.
+
+    Only network errors and 5xx responses are retried; other HTTP errors such
+    as 429 would not improve (or would get worse) when repeated immediately.
+    """
+    for attempt in range(attempts - 1):
+        try:
+            return await coro_factory()
+        except VeluxActiveConnectionError as err:
+            cause = err.__cause__
+            if isinstance(cause, aiohttp.ClientResponseError) and cause.status < 500:
+                raise
+            delay = min(cap, base * 2**attempt) * (1 + random.random() * 0.5)
+            _LOGGER.debug("Request failed (%s), retrying in %.1f s", err, delay)
+            await asyncio.sleep(delay)
+    return await coro_factory()
+
 
 class VeluxActiveCoordinator(DataUpdateCoordinator[dict[str, Any]]):
     """Manages fetching data from the Velux ACTIVE cloud."""
 
+    __slots__ = (
+        "api",
+        "home_id",
+        "module_names",
+        "room_names",
+        "module_rooms",
+        "modules_by_id",
+        "modules_by_type",
+        "rooms_by_id",
+        "_names_fetched_at",
+        "_module_ids",
+        "_token_debouncer",
+    )
+
     config_entry: ConfigEntry
 
     def __init__(
@@ -33,73 +85,144 @@ class VeluxActiveCoordinator(DataUpdateCoordinator[dict[str, Any]]):
             _LOGGER,
             name=DOMAIN,
             update_interval=timedelta(seconds=UPDATE_INTERVAL),
+            # Collapse the refreshes requested by several cover commands
+            request_refresh_debouncer=Debouncer(
+                hass, _LOGGER, cooldown=1.0, immediate=False
+            ),
         )
         self.api = api
         self.home_id = home_id
         self.module_names: dict[str, str] = {}
         self.room_names: dict[str, str] = {}
         self.module_rooms: dict[str, str] = {}
-        self._names_fetched = False
-
-    def _extract_names(self, data: Any) -> None:
-        """Recursively extract all 'id' -> 'name' and 'room_id' mappings."""
-        if isinstance(data, dict):
-            item_id = data.get("id")
-            if isinstance(item_id, str):
-                if item_name := data.get("name"):
-                    if isinstance(item_name, str):
-                        self.module_names[item_id] = item_name
-                        self.room_names[item_id] = item_name
-                if room_id := data.get("room_id"):
-                    if isinstance(room_id, str):
-                        self.module_rooms[item_id] = room_id
-            for value in data.values():
-                self._extract_names(value)
-        elif isinstance(data, list):
-            for item in data:
-                self._extract_names(item)
+        self.modules_by_id: dict[str, dict[str, Any]] = {}
+        self.modules_by_type: dict[str, list[dict[str, Any]]] = {}
+        self.rooms_by_id: dict[str, dict[str, Any]] = {}
+        self._names_fetched_at: float | None = None
+        self._module_ids: frozenset[str] = frozenset()
+        self._token_debouncer = Debouncer(
+            hass,
+            _LOGGER,
+            cooldown=TOKEN_PERSIST_DELAY,
+            immediate=False,
+            function=self._async_persist_tokens,
+        )
 
-    async def _async_fetch_names(self) -> None:
-        """Fetch human-readable names from homesdata."""
-        if self._names_fetched:
+    @callback
+    def _async_persist_tokens(self) -> None:
+        """Write refreshed tokens back to the config entry."""
+        if not self.api.tokens_dirty:
             return
+        self.hass.config_entries.async_update_entry(
+            self.config_entry,
+            data={
+                **self.config_entry.data,
+                "token_data": {
+                    "access_token": self.api.access_token,
+                    "refresh_token": self.api.refresh_token,
+                    "token_expires_at": self.api.token_expires_at,
+                },
+            },
+        )
+        self.api.mark_tokens_persisted()
+
+    async def async_shutdown(self) -> None:
+        """Flush pending token writes and shut down the coordinator."""
+        await super().async_shutdown()
+        await self.api.async_close()
+        self._token_debouncer.async_cancel()
+        self._async_persist_tokens()
 
+    async def _async_fetch_names(self) -> None:
+        """Fetch human-readable names from homesdata."""
         try:
             data = await self.api.async_get_homes_data()
         except (VeluxActiveAuthError, VeluxActiveConnectionError) as err:
             _LOGGER.warning("Failed to fetch homes data for names: %s", err)
             return
 
-        homes = data.get("body", {}).get("homes", [])
-        for home in homes:
-            if home.get("id") == self.home_id:
-                self._extract_names(home)
-        
-        self._names_fetched = True
+        homes: list[dict[str, Any]] = data.get("body", {}).get("homes", [])
+        home = next((h for h in homes if h.get("id") == self.home_id), {})
+        for module in home.get("modules", []):
+            if not (module_id := module.get("id")):
+                continue
+            if name := module.get("name"):
+                self.module_names[module_id] = name
+            if room_id := module.get("room_id"):
+                self.module_rooms[module_id] = room_id
+        for room in home.get("rooms", []):
+            if (room_id := room.get("id")) and (name := room.get("name")):
+                self.room_names[room_id] = name
+
+        self._names_fetched_at = time.monotonic()
+
+    def _inject_names(self, home: dict[str, Any]) -> None:
+        """Inject human-readable names and relationships into the status."""
+        if self.module_names or self.module_rooms:
+            for module in home.get("modules", ()):
+                if (module_id := module.get("id")) is None:
+                    continue
+                if (name := self.module_names.get(module_id)) is not None:
+                    module["name"] = name
+                if (room_id := self.module_rooms.get(module_id)) is not None:
+                    module["room_id"] = room_id
+
+        if self.room_names:
+            for room in home.get("rooms", ()):
+                if (name := self.room_names.get(room.get("id"))) is not None:
+                    room["name"] = name
 
     async def _async_update_data(self) -> dict[str, Any]:
         """Fetch data from the Velux ACTIVE API."""
-        if not self._names_fetched:
-            await self._async_fetch_names()
-
+        names_task: asyncio.Task[None] | None = None
+        if (
+            self._names_fetched_at is None
+            or time.monotonic() - self._names_fetched_at > NAMES_REFRESH_INTERVAL
+        ):
+            # Fetch names alongside the status rather than ahead of it
+            names_task = self.hass.async_create_task(self._async_fetch_names())
+
+        status: dict[str, Any] | None = None
         try:
-            status = await self.api.async_get_home_status(self.home_id)
+            status = await _call_with_retry(
+                lambda: self.api.async_get_home_status(self.home_id)
+            )
         except VeluxActiveAuthError as err:
             raise ConfigEntryAuthFailed(err) from err
         except VeluxActiveConnectionError as err:
             raise UpdateFailed(err) from err
+        finally:
+            if status is None and names_task is not None:
+                # Don't leave the names fetch running past a failed poll; the
+                # names are still stale, so the next poll fetches them again
+                names_task.cancel()
+
+        if self.api.tokens_dirty:
+            self._token_debouncer.async_schedule_call()
 
         home: dict[str, Any] = status.get("body", {}).get("home", {})
 
-        # Inject human-readable names and relationships
-        for module in home.get("modules", []):
-            if module.get("id") in self.module_names:
-                module["name"] = self.module_names[module["id"]]
-            if module.get("id") in self.module_rooms:
-                module["room_id"] = self.module_rooms[module["id"]]
-                
-        for room in home.get("rooms", []):
-            if room.get("id") in self.room_names:
-                room["name"] = self.room_names[room["id"]]
+        module_ids = frozenset(
+            module["id"] for module in home.get("modules", ()) if "id" in module
+        )
+        if names_task is not None:
+            await names_task
+        elif module_ids != self._module_ids:
+            # A module was paired or removed since the last names refresh
+            await self._async_fetch_names()
+        self._module_ids = module_ids
+
+        self._inject_names(home)
+
+        self.modules_by_id = {
+            module["id"]: module for module in home.get("modules", []) if "id" in module
+        }
+        modules_by_type: dict[str, list[dict[str, Any]]] = {}
+        for module in self.modules_by_id.values():
+            modules_by_type.setdefault(module.get("type", ""), []).append(module)
+        self.modules_by_type = modules_by_type
+        self.rooms_by_id = {
+            room["id"]: room for room in home.get("rooms", []) if "id" in room
+        }
 
         return home
@@ -2,6 +2,8 @@
 from __future__ import annotations
 
 import logging
+from collections.abc import Mapping
+from types import MappingProxyType
 from typing import Any
 
 from homeassistant.components.cover import (
@@ -17,19 +19,31 @@ from homeassistant.helpers.device_registry import DeviceInfo
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
-from .const import DOMAIN, MODULE_TYPE_BRIDGE, MODULE_TYPE_ROLLER_SHUTTER, MODEL_MAP
+from .const import DOMAIN, MANUFACTURER, MODULE_TYPE_BRIDGE, MODULE_TYPE_ROLLER_SHUTTER, MODEL_MAP
 from .coordinator import VeluxActiveCoordinator
 
 _LOGGER = logging.getLogger(__name__)
 
-VELUX_TYPE_TO_DEVICE_CLASS = {
-    "window": CoverDeviceClass.WINDOW,
-    "shutter": CoverDeviceClass.SHUTTER,
-    "blind": CoverDeviceClass.BLIND,
-    "awning": CoverDeviceClass.AWNING,
-    "curtain": CoverDeviceClass.CURTAIN,
-    "shade": CoverDeviceClass.SHADE,
-}
+
+class _DeviceClassMap(dict[str, CoverDeviceClass]):
+    """Device class lookup that falls back to a shutter for unknown types."""
+
+    def __missing__(self, key: str) -> CoverDeviceClass:
+        return CoverDeviceClass.SHUTTER
+
+
+VELUX_TYPE_TO_DEVICE_CLASS: Mapping[str, CoverDeviceClass] = MappingProxyType(
+    _DeviceClassMap(
+        {
+            "window": CoverDeviceClass.WINDOW,
+            "shutter": CoverDeviceClass.SHUTTER,
+            "blind": CoverDeviceClass.BLIND,
+            "awning": CoverDeviceClass.AWNING,
+            "curtain": CoverDeviceClass.CURTAIN,
+            "shade": CoverDeviceClass.SHADE,
+        }
+    )
+)
 
 
 async def async_setup_entry(
@@ -38,13 +52,11 @@ async def async_setup_entry(
     async_add_entities: AddEntitiesCallback,
 ) -> None:
     """Set up Velux ACTIVE cover entities from a config entry."""
-    coordinator: VeluxActiveCoordinator = hass.data[DOMAIN][entry.entry_id]
+    coordinator: VeluxActiveCoordinator = entry.runtime_data
 
-    modules: list[dict[str, Any]] = coordinator.data.get("modules", [])
     entities = [
         VeluxActiveCover(coordinator, module)
-        for module in modules
-        if module.get("type") == MODULE_TYPE_ROLLER_SHUTTER
+        for module in coordinator.modules_by_type.get(MODULE_TYPE_ROLLER_SHUTTER, [])
     ]
     async_add_entities(entities)
 
@@ -52,6 +64,10 @@ async def async_setup_entry(
 class VeluxActiveCover(CoordinatorEntity[VeluxActiveCoordinator], CoverEntity):
     """Representation of a Velux ACTIVE cover (roller shutter / window)."""
 
+    # Only our own attributes: _attr_* names must stay in the instance dict
+    # for Home Assistant's cached entity properties.
+    __slots__ = ("_module_id", "_bridge_id")
+
     _attr_has_entity_name = True
     _attr_name = None
     _attr_supported_features = (
@@ -72,9 +88,7 @@ class VeluxActiveCover(CoordinatorEntity[VeluxActiveCoordinator], CoverEntity):
         self._bridge_id: str = module.get("bridge", "")
         self._attr_unique_id = self._module_id
         velux_type: str = module.get("velux_type", "shutter")
-        self._attr_device_class = VELUX_TYPE_TO_DEVICE_CLASS.get(
-            velux_type, CoverDeviceClass.SHUTTER
-        )
+        self._attr_device_class = VELUX_TYPE_TO_DEVICE_CLASS[velux_type]
         
         device_name = module.get("name")
         if not device_name or device_name == self._module_id:
@@ -93,29 +107,43 @@ class VeluxActiveCover(CoordinatorEntity[VeluxActiveCoordinator], CoverEntity):
         self._attr_device_info = DeviceInfo(
             identifiers={(DOMAIN, self._module_id)},
             name=device_name,
-            manufacturer=module.get("manufacturer", "Velux"),
-            model=MODEL_MAP.get(module.get("velux_type", MODULE_TYPE_ROLLER_SHUTTER), module.get("velux_type", MODULE_TYPE_ROLLER_SHUTTER)),
+            manufacturer=module.get("manufacturer", MANUFACTURER),
+            model=MODEL_MAP.get(velux_type, velux_type),
             via_device=(DOMAIN, self._bridge_id) if self._bridge_id else None,
             sw_version=fw_ver if fw_ver else None,
             hw_version=hw_ver if hw_ver else None,
             connections=set(),
         )
-        # Initialise cached position from the first coordinator payload
-        self._attr_current_cover_position: int | None = module.get("current_position")
+        # Initialise cached state from the first coordinator payload
+        self._update_movement(module)
+        self._attr_available = coordinator.last_update_success and module.get(
+            "reachable", True
+        )
 
     @property
     def _module(self) -> dict[str, Any]:
         """Return the current module status data."""
-        for mod in self.coordinator.data.get("modules", []):
-            if mod.get("id") == self._module_id:
-                return mod
-        return {}
+        return self.coordinator.modules_by_id.get(self._module_id, {})
+
+    def _update_movement(self, mod: dict[str, Any]) -> None:
+        """Cache position and direction from the module status."""
+        cur: int | None = mod.get("current_position")
+        tgt: int | None = mod.get("target_position")
+        self._attr_current_cover_position = cur
+        if cur is None or tgt is None:
+            self._attr_is_opening = self._attr_is_closing = False
+        else:
+            self._attr_is_opening = tgt > cur
+            self._attr_is_closing = tgt < cur
 
     @callback
     def _handle_coordinator_update(self) -> None:
         """Update cached state from the coordinator and write to HA."""
         mod = self._module
-        self._attr_current_cover_position = mod.get("current_position")
+        self._update_movement(mod)
+        self._attr_available = self.coordinator.last_update_success and mod.get(
+            "reachable", True
+        )
         super()._handle_coordinator_update()
 
     @property
@@ -126,56 +154,26 @@ class VeluxActiveCover(CoordinatorEntity[VeluxActiveCoordinator], CoverEntity):
             return None
         return pos == 0
 
-    @property
-    def is_opening(self) -> bool:
-        """Return True if the cover is opening."""
-        mod = self._module
-        cur = mod.get("current_position")
-        tgt = mod.get("target_position")
-        if cur is None or tgt is None:
-            return False
-        return tgt > cur
-
-    @property
-    def is_closing(self) -> bool:
-        """Return True if the cover is closing."""
-        mod = self._module
-        cur = mod.get("current_position")
-        tgt = mod.get("target_position")
-        if cur is None or tgt is None:
-            return False
-        return tgt < cur
-
     @property
     def available(self) -> bool:
         """Return True if the module is reachable."""
-        return self.coordinator.last_update_success and self._module.get(
-            "reachable", True
-        )
+        # CoordinatorEntity overrides Entity.available, so expose the cached value
+        return self._attr_available
 
     async def async_open_cover(self, **kwargs: Any) -> None:
         """Open the cover fully (100%)."""
-        await self.coordinator.api.async_set_cover_position(
-            self.coordinator.home_id, self._bridge_id, self._module_id, 100
-        )
-        # Optimistic update – give instant UI feedback before the next poll
-        self._attr_current_cover_position = 100
-        self.async_write_ha_state()
-        await self.coordinator.async_request_refresh()
+        await self._async_set_position(100)
 
     async def async_close_cover(self, **kwargs: Any) -> None:
         """Close the cover fully (0%)."""
-        await self.coordinator.api.async_set_cover_position(
-            self.coordinator.home_id, self._bridge_id, self._module_id, 0
-        )
-        # Optimistic update – give instant UI feedback before the next poll
-        self._attr_current_cover_position = 0
-        self.async_write_ha_state()
-        await self.coordinator.async_request_refresh()
+        await self._async_set_position(0)
 
     async def async_set_cover_position(self, **kwargs: Any) -> None:
         """Set the cover to a specific position."""
-        position: int = kwargs[ATTR_POSITION]
+        await self._async_set_position(kwargs[ATTR_POSITION])
+
+    async def _async_set_position(self, position: int) -> None:
+        """Move the cover; the API batches commands from concurrent covers."""
         await self.coordinator.api.async_set_cover_position(
             self.coordinator.home_id, self._bridge_id, self._module_id, position
         )
@@ -17,13 +17,13 @@ from homeassistant.const import (
     UnitOfTemperature,
     LIGHT_LUX,
 )
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers import device_registry as dr
 from homeassistant.helpers.device_registry import DeviceInfo
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
-from .const import DOMAIN, MODEL_MAP
+from .const import DOMAIN, MANUFACTURER, MODULE_TYPE_SENSOR, MODEL_MAP
 from .coordinator import VeluxActiveCoordinator
 
 
@@ -105,6 +105,9 @@ MODULE_SENSOR_DESCRIPTIONS: tuple[VeluxModuleSensorEntityDescription, ...] = (
     ),
 )
 
+_ROOM_DESC_PAIRS = tuple((d.room_key, d) for d in ROOM_SENSOR_DESCRIPTIONS)
+_MODULE_DESC_PAIRS = tuple((d.module_key, d) for d in MODULE_SENSOR_DESCRIPTIONS)
+
 
 async def async_setup_entry(
     hass: HomeAssistant,
@@ -112,22 +115,33 @@ async def async_setup_entry(
     async_add_entities: AddEntitiesCallback,
 ) -> None:
     """Set up Velux ACTIVE sensor entities from a config entry."""
-    coordinator: VeluxActiveCoordinator = hass.data[DOMAIN][entry.entry_id]
+    coordinator: VeluxActiveCoordinator = entry.runtime_data
 
     entities: list[SensorEntity] = []
     
     # Room sensors
     rooms: list[dict[str, Any]] = coordinator.data.get("rooms", [])
+    room_model = MODEL_MAP.get(MODULE_TYPE_SENSOR, MODULE_TYPE_SENSOR)
     for room in rooms:
-        for description in ROOM_SENSOR_DESCRIPTIONS:
-            if room.get(description.room_key) is not None:
-                entities.append(VeluxActiveRoomSensor(coordinator, room, description))
+        # All sensors of a room share one device
+        device_info = DeviceInfo(
+            identifiers={(DOMAIN, room["id"])},
+            name=room.get("name", room["id"]),
+            manufacturer=MANUFACTURER,
+            model=room_model,
+            connections=set(),
+        )
+        for room_key, description in _ROOM_DESC_PAIRS:
+            if room.get(room_key) is not None:
+                entities.append(
+                    VeluxActiveRoomSensor(coordinator, room, description, device_info)
+                )
 
     # Module sensors (like battery)
     modules: list[dict[str, Any]] = coordinator.data.get("modules", [])
     for module in modules:
-        for description in MODULE_SENSOR_DESCRIPTIONS:
-            if module.get(description.module_key) is not None:
+        for module_key, description in _MODULE_DESC_PAIRS:
+            if module.get(module_key) is not None:
                 entities.append(VeluxActiveModuleSensor(coordinator, module, description))
 
     async_add_entities(entities)
@@ -138,6 +152,9 @@ class VeluxActiveRoomSensor(
 ):
     """A sensor for a Velux ACTIVE room measurement."""
 
+    # Only our own attributes; _attr_* names stay in the instance dict
+    __slots__ = ("_room_id", "_cached_room")
+
     _attr_has_entity_name = True
     _attr_name = None
 
@@ -146,6 +163,7 @@ class VeluxActiveRoomSensor(
         coordinator: VeluxActiveCoordinator,
         room: dict[str, Any],
         description: VeluxRoomSensorEntityDescription,
+        device_info: DeviceInfo,
     ) -> None:
         """Initialize the sensor."""
         super().__init__(coordinator)
@@ -153,24 +171,19 @@ class VeluxActiveRoomSensor(
         self.entity_description = description
         self._attr_unique_id = f"{self._room_id}_{description.key}"
         self._attr_name = description.name
-        
-        device_name = room.get("name", self._room_id)
-        
-        self._attr_device_info = DeviceInfo(
-            identifiers={(DOMAIN, self._room_id)},
-            name=device_name,
-            manufacturer="Velux",
-            model=MODEL_MAP.get("NXS", "NXS"),
-            connections=set(),
-        )
+        self._attr_device_info = device_info
+        self._cached_room = room
 
     @property
     def _room(self) -> dict[str, Any]:
-        """Return the current room status data."""
-        for room in self.coordinator.data.get("rooms", []):
-            if room.get("id") == self._room_id:
-                return room
-        return {}
+        """Return the room status data cached at the last update."""
+        return self._cached_room
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Update the cached room from the coordinator and write to HA."""
+        self._cached_room = self.coordinator.rooms_by_id.get(self._room_id, {})
+        super()._handle_coordinator_update()
 
     @property
     def native_value(self) -> Any:
@@ -186,6 +199,9 @@ class VeluxActiveModuleSensor(
 ):
     """A sensor for a Velux ACTIVE module (e.g. battery)."""
 
+    # Only our own attributes; _attr_* names stay in the instance dict
+    __slots__ = ("_module_id", "_cached_module")
+
     _attr_has_entity_name = True
     _attr_name = None
 
@@ -205,8 +221,10 @@ class VeluxActiveModuleSensor(
         device_id = self._module_id
         device_name = module.get("name", self._module_id)
         
+        module_type = module.get("type", "Unknown")
+
         # If this is a room sensor (NXS), attach its battery to the Room device
-        if module.get("type") == "NXS" and "room_id" in module:
+        if module_type == MODULE_TYPE_SENSOR and "room_id" in module:
             device_id = module["room_id"]
             
         fw_ver = str(module.get("firmware_revision", ""))
@@ -215,20 +233,24 @@ class VeluxActiveModuleSensor(
         self._attr_device_info = DeviceInfo(
             identifiers={(DOMAIN, device_id)},
             name=device_name,
-            manufacturer="Velux",
-            model=MODEL_MAP.get(module.get("type", "Unknown"), module.get("type", "Unknown")),
+            manufacturer=MANUFACTURER,
+            model=MODEL_MAP.get(module_type, module_type),
             sw_version=fw_ver if fw_ver else None,
             hw_version=hw_ver if hw_ver else None,
             connections=set(),
         )
+        self._cached_module = module
 
     @property
     def _module(self) -> dict[str, Any]:
-        """Return the current module status data."""
-        for module in self.coordinator.data.get("modules", []):
-            if module.get("id") == self._module_id:
-                return module
-        return {}
+        """Return the module status data cached at the last update."""
+        return self._cached_module
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Update the cached module from the coordinator and write to HA."""
+        self._cached_module = self.coordinator.modules_by_id.get(self._module_id, {})
+        super()._handle_coordinator_update()
 
     @property
     def native_value(self) -> Any:
@@ -12,7 +12,7 @@ from homeassistant.helpers.device_registry import DeviceInfo
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
-from .const import DOMAIN, MODULE_TYPE_ROLLER_SHUTTER, MODEL_MAP
+from .const import DOMAIN, MANUFACTURER, MODULE_TYPE_ROLLER_SHUTTER, MODEL_MAP
 from .coordinator import VeluxActiveCoordinator
 
 _LOGGER = logging.getLogger(__name__)
@@ -24,22 +24,26 @@ async def async_setup_entry(
     async_add_entities: AddEntitiesCallback,
 ) -> None:
     """Set up Velux ACTIVE switch entities from a config entry."""
-    coordinator: VeluxActiveCoordinator = hass.data[DOMAIN][entry.entry_id]
+    coordinator: VeluxActiveCoordinator = entry.runtime_data
 
-    modules: list[dict[str, Any]] = coordinator.data.get("modules", [])
-    entities: list[SwitchEntity] = []
-    
-    for module in modules:
-        # Check if the module supports silent mode (it's present in the payload)
-        if module.get("type") == MODULE_TYPE_ROLLER_SHUTTER and "silent" in module:
-            entities.append(VeluxActiveSilentSwitch(coordinator, module))
-
-    async_add_entities(entities)
+    # Only modules that report a silent flag in the payload support silent mode
+    async_add_entities(
+        [
+            VeluxActiveSilentSwitch(coordinator, module)
+            for module in coordinator.modules_by_type.get(
+                MODULE_TYPE_ROLLER_SHUTTER, []
+            )
+            if "silent" in module
+        ]
+    )
 
 
 class VeluxActiveSilentSwitch(CoordinatorEntity[VeluxActiveCoordinator], SwitchEntity):
     """A switch to toggle silent mode for a Velux ACTIVE cover."""
 
+    # Only our own attributes; _attr_* names stay in the instance dict
+    __slots__ = ("_module_id", "_bridge_id", "_cached_module")
+
     _attr_has_entity_name = True
     _attr_translation_key = "silent_mode"
     _attr_icon = "mdi:volume-variant-off"
@@ -72,28 +76,26 @@ class VeluxActiveSilentSwitch(CoordinatorEntity[VeluxActiveCoordinator], SwitchE
         self._attr_device_info = DeviceInfo(
             identifiers={(DOMAIN, self._module_id)},
             name=device_name,
-            manufacturer=module.get("manufacturer", "Velux"),
+            manufacturer=module.get("manufacturer", MANUFACTURER),
             model=MODEL_MAP.get(velux_type, velux_type),
             via_device=(DOMAIN, self._bridge_id) if self._bridge_id else None,
             sw_version=fw_ver if fw_ver else None,
             hw_version=hw_ver if hw_ver else None,
             connections=set(),
         )
+        self._cached_module = module
         self._attr_is_on = module.get("silent", False)
 
     @property
     def _module(self) -> dict[str, Any]:
-        """Return the current module status data."""
-        for mod in self.coordinator.data.get("modules", []):
-            if mod.get("id") == self._module_id:
-                return mod
-        return {}
+        """Return the module status data cached at the last update."""
+        return self._cached_module
 
     @callback
     def _handle_coordinator_update(self) -> None:
         """Update cached state from the coordinator and write to HA."""
-        mod = self._module
-        self._attr_is_on = mod.get("silent", False)
+        self._cached_module = self.coordinator.modules_by_id.get(self._module_id, {})
+        self._attr_is_on = self._cached_module.get("silent", False)
         super()._handle_coordinator_update()
 
     async def async_turn_on(self, **kwargs: Any) -> None:
@@ -101,8 +103,10 @@ class VeluxActiveSilentSwitch(CoordinatorEntity[VeluxActiveCoordinator], SwitchE
         await self.coordinator.api.async_set_silent_mode(
             self.coordinator.home_id, self._bridge_id, self._module_id, True
         )
+        # Optimistic update – give instant UI feedback before the next poll
         self._attr_is_on = True
         self.async_write_ha_state()
+        await self.coordinator.async_request_refresh()
 
     async def async_turn_off(self, **kwargs: Any) -> None:
         """Turn the entity off."""
@@ -111,3 +115,4 @@ class VeluxActiveSilentSwitch(CoordinatorEntity[VeluxActiveCoordinator], SwitchE
         )
         self._attr_is_on = False
         self.async_write_ha_state()
+        await self.coordinator.async_request_refresh()
@@ -1,5 +1,9 @@
+"""Dump raw Velux ACTIVE API responses for debugging.
+
+Requires aiohttp, multidict and orjson, the same packages the integration's
+API client imports (all of them ship with Home Assistant).
+"""
 import asyncio
-import json
 import os
 import sys
 
@@ -7,9 +11,15 @@ import sys
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 import aiohttp
+import orjson
 from custom_components.velux_active.api import VeluxActiveApi
 from custom_components.velux_active.const import DEFAULT_CLIENT_ID, DEFAULT_CLIENT_SECRET
 
+def write_json(path, data):
+    """Write data to path as indented JSON."""
+    with open(path, "wb") as f:
+        f.write(orjson.dumps(data, option=orjson.OPT_INDENT_2))
+
 async def main():
     print("=== Velux Active API Data Dumper ===")
     username = input("Email address: ")
@@ -37,34 +47,36 @@ async def main():
         print("Fetching homesdata...")
         try:
             homesdata = await api.async_get_homes_data()
-            with open("homesdata_dump.json", "w") as f:
-                json.dump(homesdata, f, indent=2)
+            write_json("homesdata_dump.json", homesdata)
             print("Saved homesdata to homesdata_dump.json")
             
             # Print a quick summary of found modules to the console
             homes = homesdata.get("body", {}).get("homes", [])
+            lines = []
             for home in homes:
-                print()
-                print(f"Home: {home.get('name', home.get('id'))}")
-                print("-" * 40)
-                
+                lines.append("")
+                lines.append(f"Home: {home.get('name', home.get('id'))}")
+                lines.append("-" * 40)
+
                 # Check top-level modules
-                print("Modules array:")
-                for module in home.get("modules", []):
-                    m_id = module.get("id")
-                    m_name = module.get("name", "<NO NAME>")
-                    m_type = module.get("type", "<NO TYPE>")
-                    v_type = module.get("velux_type", "")
-                    print(f"  - ID: {m_id} | Name: {m_name} | Type: {m_type} | Velux Type: {v_type}")
-                
+                lines.append("Modules array:")
+                lines.extend(
+                    f"  - ID: {module.get('id')} | Name: {module.get('name', '<NO NAME>')}"
+                    f" | Type: {module.get('type', '<NO TYPE>')}"
+                    f" | Velux Type: {module.get('velux_type', '')}"
+                    for module in home.get("modules", [])
+                )
+
                 # Check rooms
-                print()
-                print("Rooms array:")
-                for room in home.get("rooms", []):
-                    r_id = room.get("id")
-                    r_name = room.get("name", "<NO NAME>")
-                    print(f"  - Room: {r_name} (ID: {r_id})")
-                    
+                lines.append("")
+                lines.append("Rooms array:")
+                lines.extend(
+                    f"  - Room: {room.get('name', '<NO NAME>')} (ID: {room.get('id')})"
+                    for room in home.get("rooms", [])
+                )
+            if lines:
+                sys.stdout.write("\n".join(lines) + "\n")
+
         except Exception as e:
             print(f"Failed to fetch homesdata: {e}")
             
@@ -74,18 +86,18 @@ async def main():
             if homes:
                 home_id = homes[0].get("id")
                 homestatus = await api.async_get_home_status(home_id)
-                with open("homestatus_dump.json", "w") as f:
-                    json.dump(homestatus, f, indent=2)
+                write_json("homestatus_dump.json", homestatus)
                 print("Saved homestatus to homestatus_dump.json")
                 
-                print()
-                print("Home Status Modules:")
-                for module in homestatus.get("body", {}).get("home", {}).get("modules", []):
-                    m_id = module.get("id")
-                    m_type = module.get("type", "<NO TYPE>")
-                    silent = module.get("silent", "N/A")
-                    print(f"  - ID: {m_id} | Type: {m_type} | Silent: {silent}")
-                
+                modules = homestatus.get("body", {}).get("home", {}).get("modules", [])
+                lines = ["", "Home Status Modules:"]
+                lines.extend(
+                    f"  - ID: {module.get('id')} | Type: {module.get('type', '<NO TYPE>')}"
+                    f" | Silent: {module.get('silent', 'N/A')}"
+                    for module in modules
+                )
+                sys.stdout.write("\n".join(lines) + "\n")
+
             else:
                 print("No homes found to fetch status for.")
         except Exception as e:
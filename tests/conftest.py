@@ -1,6 +1,7 @@
 """Test fixtures for Velux ACTIVE integration tests."""
 from __future__ import annotations
 
+import time
 from typing import Any
 from unittest.mock import AsyncMock, MagicMock, patch
 
@@ -17,6 +18,8 @@ MOCK_HOME_NAME = "My Home"
 MOCK_MODULE_ID = "module456"
 MOCK_BRIDGE_ID = "bridge789"
 
+# The payloads below are shared by every test and must be treated as read-only;
+# tests that need to modify one should copy it first.
 MOCK_TOKEN_DATA: dict[str, Any] = {
     "access_token": "mock_access_token",
     "refresh_token": "mock_refresh_token",
@@ -68,3 +71,26 @@ MOCK_HOME_STATUS: dict[str, Any] = {
     },
     "status": "ok",
 }
+
+
+@pytest.fixture(scope="session")
+def mock_homes_data() -> dict[str, Any]:
+    """Return the shared homesdata payload."""
+    return MOCK_HOMES_DATA
+
+
+@pytest.fixture(scope="session")
+def mock_home_status() -> dict[str, Any]:
+    """Return the shared homestatus payload."""
+    return MOCK_HOME_STATUS
+
+
+@pytest.fixture
+def authed_api() -> tuple[VeluxActiveApi, MagicMock]:
+    """Return an API client holding valid tokens and its mock session."""
+    session = MagicMock()
+    api = VeluxActiveApi(
+        session, MOCK_USERNAME, MOCK_PASSWORD, MOCK_CLIENT_ID, MOCK_CLIENT_SECRET
+    )
+    api.restore_tokens("token", "refresh", time.time() + 3600)
+    return api, session
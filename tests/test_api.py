@@ -1,9 +1,14 @@
 """Tests for the Velux ACTIVE API client."""
 from __future__ import annotations
 
+import asyncio
 import time
+from collections.abc import Awaitable, Callable, Iterator
+from typing import Any
 from unittest.mock import AsyncMock, MagicMock, patch
 
+import aiohttp
+import orjson
 import pytest
 
 from custom_components.velux_active.api import (
@@ -11,6 +16,7 @@ from custom_components.velux_active.api import (
     VeluxActiveAuthError,
     VeluxActiveConnectionError,
 )
+from custom_components.velux_active.const import AUTH_URL
 from tests.conftest import (
     MOCK_CLIENT_ID,
     MOCK_CLIENT_SECRET,
@@ -23,15 +29,44 @@ from tests.conftest import (
 )
 
 
-def _make_mock_response(status: int, json_data: dict) -> MagicMock:
+class _MockResponse:
+    """Lightweight stand-in for an aiohttp response context manager."""
+
+    def __init__(self, status: int, json_data: dict | bytes) -> None:
+        self.status = status
+        self.ok = status < 400
+        # Raw bytes stand in for a body that is not JSON
+        self._body = (
+            json_data if isinstance(json_data, bytes) else orjson.dumps(json_data)
+        )
+
+    async def json(self, **kwargs: Any) -> Any:
+        return kwargs.get("loads", orjson.loads)(self._body)
+
+    async def read(self) -> bytes:
+        return self._body
+
+    async def __aenter__(self) -> _MockResponse:
+        if not self.ok:
+            # Mirror aiohttp's raise_for_status=True, which raises on entry
+            raise aiohttp.ClientResponseError(MagicMock(), (), status=self.status)
+        return self
+
+    async def __aexit__(self, *args: Any) -> bool:
+        return False
+
+
+def _make_mock_response(status: int, json_data: dict | bytes) -> _MockResponse:
     """Create a mock aiohttp response."""
-    mock_resp = AsyncMock()
-    mock_resp.status = status
-    mock_resp.ok = status < 400
-    mock_resp.json = AsyncMock(return_value=json_data)
-    mock_resp.__aenter__ = AsyncMock(return_value=mock_resp)
-    mock_resp.__aexit__ = AsyncMock(return_value=False)
-    return mock_resp
+    return _MockResponse(status, json_data)
+
+
+def _with_token_endpoint(
+    response: _MockResponse,
+) -> Callable[..., _MockResponse]:
+    """Return a post side effect that grants tokens and otherwise replies response."""
+    token_response = _make_mock_response(200, MOCK_TOKEN_DATA)
+    return lambda url, **kwargs: token_response if url == AUTH_URL else response
 
 
 def _make_api(session: MagicMock) -> VeluxActiveApi:
@@ -43,7 +78,6 @@ def _make_api(session: MagicMock) -> VeluxActiveApi:
 class TestAuthentication:
     """Tests for VeluxActiveApi authentication."""
 
-    @pytest.mark.asyncio
     async def test_authenticate_success(self) -> None:
         """Test successful authentication."""
         session = MagicMock()
@@ -57,7 +91,6 @@ class TestAuthentication:
         assert api.refresh_token == "mock_refresh_token"
         assert api.token_expires_at > time.time()
 
-    @pytest.mark.asyncio
     async def test_authenticate_invalid_credentials(self) -> None:
         """Test authentication with invalid credentials raises VeluxActiveAuthError."""
         session = MagicMock()
@@ -67,11 +100,8 @@ class TestAuthentication:
         with pytest.raises(VeluxActiveAuthError):
             await api.async_authenticate()
 
-    @pytest.mark.asyncio
     async def test_authenticate_connection_error(self) -> None:
         """Test that connection errors are wrapped."""
-        import aiohttp
-
         session = MagicMock()
         session.post = MagicMock(side_effect=aiohttp.ClientError("timeout"))
         api = _make_api(session)
@@ -79,7 +109,29 @@ class TestAuthentication:
         with pytest.raises(VeluxActiveConnectionError):
             await api.async_authenticate()
 
-    @pytest.mark.asyncio
+    async def test_authenticate_non_json_body(self) -> None:
+        """Test that a token response that is not JSON is a connection error."""
+        session = MagicMock()
+        session.post = MagicMock(
+            return_value=_make_mock_response(200, b"<html>captive portal</html>")
+        )
+        api = _make_api(session)
+
+        with pytest.raises(VeluxActiveConnectionError):
+            await api.async_authenticate()
+
+    async def test_refresh_token_non_json_body(self) -> None:
+        """Test that a refresh response that is not JSON is a connection error."""
+        session = MagicMock()
+        session.post = MagicMock(
+            return_value=_make_mock_response(200, b"<html>maintenance</html>")
+        )
+        api = _make_api(session)
+        api.restore_tokens("old_token", "old_refresh", time.time() - 1)
+
+        with pytest.raises(VeluxActiveConnectionError):
+            await api.async_refresh_token()
+
     async def test_refresh_token_success(self) -> None:
         """Test successful token refresh."""
         session = MagicMock()
@@ -91,13 +143,15 @@ class TestAuthentication:
 
         assert api.access_token == "mock_access_token"
 
-    @pytest.mark.asyncio
     async def test_refresh_token_expired_falls_back_to_password(self) -> None:
         """Test that a 401 on refresh falls back to password grant."""
+        def _responses() -> Iterator[_MockResponse]:
+            yield _make_mock_response(401, {})
+            yield _make_mock_response(200, MOCK_TOKEN_DATA)
+
+        responses = _responses()
         session = MagicMock()
-        refresh_resp = _make_mock_response(401, {})
-        auth_resp = _make_mock_response(200, MOCK_TOKEN_DATA)
-        session.post = MagicMock(side_effect=[refresh_resp, auth_resp])
+        session.post = MagicMock(side_effect=lambda *args, **kwargs: next(responses))
         api = _make_api(session)
         api.restore_tokens("old_token", "old_refresh", time.time() - 1)
 
@@ -105,6 +159,23 @@ class TestAuthentication:
 
         assert api.access_token == "mock_access_token"
 
+    async def test_concurrent_callers_share_one_refresh(self) -> None:
+        """Test that concurrent callers with an expired token refresh only once."""
+        class _SlowResponse(_MockResponse):
+            async def __aenter__(self) -> _MockResponse:
+                await asyncio.sleep(0)
+                return await super().__aenter__()
+
+        session = MagicMock()
+        session.post = MagicMock(return_value=_SlowResponse(200, MOCK_TOKEN_DATA))
+        api = _make_api(session)
+        api.restore_tokens("old_token", "old_refresh", time.time() - 1)
+
+        await asyncio.gather(api._ensure_token(), api._ensure_token())
+
+        assert session.post.call_count == 1
+        assert api.access_token == "mock_access_token"
+
     def test_restore_tokens(self) -> None:
         """Test restoring tokens from stored data."""
         session = MagicMock()
@@ -117,6 +188,16 @@ class TestAuthentication:
         assert api.refresh_token == "refresh"
         assert api.token_expires_at == expires_at
 
+    def test_restore_expired_tokens_keeps_refresh_token(self) -> None:
+        """Test that an expired access token is dropped on restore."""
+        session = MagicMock()
+        api = _make_api(session)
+
+        api.restore_tokens("access", "refresh", time.time() - 1)
+
+        assert api.access_token is None
+        assert api.refresh_token == "refresh"
+
     def test_token_valid_when_not_expired(self) -> None:
         """Test that token validity is checked correctly."""
         session = MagicMock()
@@ -137,112 +218,287 @@ class TestAuthentication:
 class TestApiMethods:
     """Tests for VeluxActiveApi data fetching methods."""
 
-    @pytest.mark.asyncio
-    async def test_get_homes_data(self) -> None:
+    async def test_get_homes_data(
+        self,
+        authed_api: tuple[VeluxActiveApi, MagicMock],
+        mock_homes_data: dict[str, Any],
+    ) -> None:
         """Test fetching homes data."""
-        from tests.conftest import MOCK_HOMES_DATA
-
-        session = MagicMock()
-        session.post = MagicMock(return_value=_make_mock_response(200, MOCK_HOMES_DATA))
-        api = _make_api(session)
-        api.restore_tokens("token", "refresh", time.time() + 3600)
+        api, session = authed_api
+        session.post = MagicMock(return_value=_make_mock_response(200, mock_homes_data))
 
         result = await api.async_get_homes_data()
 
         assert result["body"]["homes"][0]["id"] == MOCK_HOME_ID
 
-    @pytest.mark.asyncio
-    async def test_get_home_status(self) -> None:
+    async def test_get_home_status(
+        self,
+        authed_api: tuple[VeluxActiveApi, MagicMock],
+        mock_home_status: dict[str, Any],
+    ) -> None:
         """Test fetching home status."""
-        from tests.conftest import MOCK_HOME_STATUS
-
-        session = MagicMock()
-        session.post = MagicMock(return_value=_make_mock_response(200, MOCK_HOME_STATUS))
-        api = _make_api(session)
-        api.restore_tokens("token", "refresh", time.time() + 3600)
+        api, session = authed_api
+        session.post = MagicMock(return_value=_make_mock_response(200, mock_home_status))
 
         result = await api.async_get_home_status(MOCK_HOME_ID)
 
         modules = result["body"]["home"]["modules"]
         assert modules[0]["id"] == MOCK_MODULE_ID
 
-    @pytest.mark.asyncio
-    async def test_set_cover_position(self) -> None:
+    @pytest.mark.parametrize(
+        "call",
+        [
+            pytest.param(lambda api: api.async_get_homes_data(), id="homes_data"),
+            pytest.param(
+                lambda api: api.async_get_home_status(MOCK_HOME_ID), id="home_status"
+            ),
+        ],
+    )
+    async def test_non_json_body_raises_connection_error(
+        self,
+        authed_api: tuple[VeluxActiveApi, MagicMock],
+        call: Callable[[VeluxActiveApi], Awaitable[Any]],
+    ) -> None:
+        """Test that a 200 response that is not JSON is a connection error."""
+        api, session = authed_api
+        session.post = MagicMock(
+            return_value=_make_mock_response(200, b"<html>maintenance</html>")
+        )
+
+        with pytest.raises(VeluxActiveConnectionError):
+            await call(api)
+
+    async def test_set_cover_position(
+        self, authed_api: tuple[VeluxActiveApi, MagicMock]
+    ) -> None:
         """Test setting a cover position."""
-        session = MagicMock()
+        api, session = authed_api
         session.post = MagicMock(
             return_value=_make_mock_response(200, {"status": "ok"})
         )
-        api = _make_api(session)
-        api.restore_tokens("token", "refresh", time.time() + 3600)
 
         await api.async_set_cover_position(MOCK_HOME_ID, MOCK_BRIDGE_ID, MOCK_MODULE_ID, 75)
 
         assert session.post.called
 
-    @pytest.mark.asyncio
-    async def test_stop_movements(self) -> None:
+    async def test_set_state_calls_are_batched(
+        self, authed_api: tuple[VeluxActiveApi, MagicMock]
+    ) -> None:
+        """Test that near-simultaneous module updates share one request."""
+        api, session = authed_api
+        session.post = MagicMock(
+            return_value=_make_mock_response(200, {"status": "ok"})
+        )
+
+        await asyncio.gather(
+            api.async_set_cover_position(MOCK_HOME_ID, MOCK_BRIDGE_ID, "m1", 0),
+            api.async_set_cover_position(MOCK_HOME_ID, MOCK_BRIDGE_ID, "m2", 100),
+            api.async_set_silent_mode(MOCK_HOME_ID, MOCK_BRIDGE_ID, "m1", True),
+        )
+
+        assert session.post.call_count == 1
+        payload = orjson.loads(session.post.call_args[1]["data"])
+        modules = payload["home"]["modules"]
+        assert [m["id"] for m in modules] == ["m1", "m2"]
+        assert modules[0]["target_position"] == 0
+        assert modules[0]["silent"] is True
+
+    async def test_set_state_last_write_wins(
+        self, authed_api: tuple[VeluxActiveApi, MagicMock]
+    ) -> None:
+        """Test that repeated commands for one module send only the latest."""
+        api, session = authed_api
+        session.post = MagicMock(
+            return_value=_make_mock_response(200, {"status": "ok"})
+        )
+
+        await asyncio.gather(
+            api.async_set_cover_position(MOCK_HOME_ID, MOCK_BRIDGE_ID, "m1", 0),
+            api.async_set_cover_position(MOCK_HOME_ID, MOCK_BRIDGE_ID, "m1", 100),
+        )
+
+        payload = orjson.loads(session.post.call_args[1]["data"])
+        assert payload["home"]["modules"] == [
+            {"bridge": MOCK_BRIDGE_ID, "id": "m1", "target_position": 100}
+        ]
+
+    async def test_set_state_error_reaches_every_caller(
+        self, authed_api: tuple[VeluxActiveApi, MagicMock]
+    ) -> None:
+        """Test that a failed batch raises in each waiting caller."""
+        api, session = authed_api
+        session.post = MagicMock(
+            side_effect=_with_token_endpoint(_make_mock_response(403, {}))
+        )
+
+        results = await asyncio.gather(
+            api.async_set_cover_position(MOCK_HOME_ID, MOCK_BRIDGE_ID, "m1", 0),
+            api.async_set_cover_position(MOCK_HOME_ID, MOCK_BRIDGE_ID, "m2", 0),
+            return_exceptions=True,
+        )
+
+        assert all(isinstance(r, VeluxActiveAuthError) for r in results)
+
+    async def test_stop_movements(
+        self, authed_api: tuple[VeluxActiveApi, MagicMock]
+    ) -> None:
         """Test stopping all movements."""
-        session = MagicMock()
+        api, session = authed_api
         session.post = MagicMock(
             return_value=_make_mock_response(200, {"status": "ok"})
         )
-        api = _make_api(session)
-        api.restore_tokens("token", "refresh", time.time() + 3600)
 
         await api.async_stop_movements(MOCK_HOME_ID, MOCK_BRIDGE_ID)
 
         assert session.post.called
 
-    @pytest.mark.asyncio
-    async def test_set_silent_mode(self) -> None:
+    async def test_stop_is_sent_after_queued_commands(
+        self, authed_api: tuple[VeluxActiveApi, MagicMock]
+    ) -> None:
+        """Test that a stop does not overtake a command still being batched."""
+        api, session = authed_api
+        session.post = MagicMock(
+            return_value=_make_mock_response(200, {"status": "ok"})
+        )
+
+        await asyncio.gather(
+            api.async_set_cover_position(MOCK_HOME_ID, MOCK_BRIDGE_ID, "m1", 100),
+            api.async_stop_movements(MOCK_HOME_ID, MOCK_BRIDGE_ID),
+        )
+
+        sent = [
+            orjson.loads(call[1]["data"])["home"]["modules"][0]
+            for call in session.post.call_args_list
+        ]
+        assert [m.get("target_position") for m in sent] == [100, None]
+        assert sent[1]["stop_movements"] == "all"
+
+    async def test_close_fails_queued_commands(
+        self, authed_api: tuple[VeluxActiveApi, MagicMock]
+    ) -> None:
+        """Test that closing the client settles commands still being batched."""
+        api, session = authed_api
+        session.post = MagicMock(
+            return_value=_make_mock_response(200, {"status": "ok"})
+        )
+
+        command = asyncio.create_task(
+            api.async_set_cover_position(MOCK_HOME_ID, MOCK_BRIDGE_ID, "m1", 100)
+        )
+        await asyncio.sleep(0)
+        await api.async_close()
+
+        with pytest.raises(VeluxActiveConnectionError):
+            await command
+        assert not session.post.called
+
+    async def test_close_cancels_commands_in_flight(
+        self, authed_api: tuple[VeluxActiveApi, MagicMock]
+    ) -> None:
+        """Test that closing the client cancels a setstate request in flight."""
+        api, session = authed_api
+        sent = asyncio.Event()
+
+        async def _hang() -> None:
+            sent.set()
+            await asyncio.Event().wait()
+
+        response = MagicMock()
+        response.__aenter__ = AsyncMock(side_effect=_hang)
+        session.post = MagicMock(return_value=response)
+
+        command = asyncio.create_task(
+            api.async_set_cover_position(MOCK_HOME_ID, MOCK_BRIDGE_ID, "m1", 100)
+        )
+        await sent.wait()
+        await api.async_close()
+
+        with pytest.raises(VeluxActiveConnectionError):
+            await command
+
+    async def test_set_silent_mode(
+        self, authed_api: tuple[VeluxActiveApi, MagicMock]
+    ) -> None:
         """Test setting silent mode."""
-        session = MagicMock()
+        api, session = authed_api
         session.post = MagicMock(
             return_value=_make_mock_response(200, {"status": "ok"})
         )
-        api = _make_api(session)
-        api.restore_tokens("token", "refresh", time.time() + 3600)
 
         await api.async_set_silent_mode(MOCK_HOME_ID, MOCK_BRIDGE_ID, MOCK_MODULE_ID, True)
 
         assert session.post.called
 
-    @pytest.mark.asyncio
-    async def test_set_persons_away(self) -> None:
+    async def test_set_persons_away(
+        self, authed_api: tuple[VeluxActiveApi, MagicMock]
+    ) -> None:
         """Test setting persons away."""
-        session = MagicMock()
+        api, session = authed_api
         session.post = MagicMock(
             return_value=_make_mock_response(200, {"status": "ok"})
         )
-        api = _make_api(session)
-        api.restore_tokens("token", "refresh", time.time() + 3600)
 
         await api.async_set_persons_away(MOCK_HOME_ID)
 
         assert session.post.called
 
-    @pytest.mark.asyncio
-    async def test_set_persons_home(self) -> None:
+    async def test_set_persons_home(
+        self, authed_api: tuple[VeluxActiveApi, MagicMock]
+    ) -> None:
         """Test setting persons home."""
-        session = MagicMock()
+        api, session = authed_api
         session.post = MagicMock(
             return_value=_make_mock_response(200, {"status": "ok"})
         )
-        api = _make_api(session)
-        api.restore_tokens("token", "refresh", time.time() + 3600)
 
         await api.async_set_persons_home(MOCK_HOME_ID)
 
         assert session.post.called
 
-    @pytest.mark.asyncio
-    async def test_get_homes_data_auth_error(self) -> None:
-        """Test that 403 raises VeluxActiveAuthError."""
+    async def test_get_homes_data_auth_error(
+        self, authed_api: tuple[VeluxActiveApi, MagicMock]
+    ) -> None:
+        """Test that a 403 persisting after a token refresh raises."""
+        api, session = authed_api
+        session.post = MagicMock(
+            side_effect=_with_token_endpoint(_make_mock_response(403, {}))
+        )
+
+        with pytest.raises(VeluxActiveAuthError):
+            await api.async_get_homes_data()
+
+        assert session.post.call_count == 3
+
+    async def test_rejected_token_is_refreshed_and_retried(
+        self,
+        authed_api: tuple[VeluxActiveApi, MagicMock],
+        mock_home_status: dict[str, Any],
+    ) -> None:
+        """Test that a token rejected before its expiry is replaced once."""
+        api, session = authed_api
+        session.post = MagicMock(
+            side_effect=[
+                _make_mock_response(401, {}),
+                _make_mock_response(200, MOCK_TOKEN_DATA),
+                _make_mock_response(200, mock_home_status),
+            ]
+        )
+
+        result = await api.async_get_home_status(MOCK_HOME_ID)
+
+        assert result["body"]["home"]["id"] == MOCK_HOME_ID
+        assert api.access_token == "mock_access_token"
+        assert session.post.call_args_list[1][0][0] == AUTH_URL
+
+    async def test_fresh_token_is_not_retried(self) -> None:
+        """Test that a denial right after obtaining a token is final."""
         session = MagicMock()
-        session.post = MagicMock(return_value=_make_mock_response(403, {}))
+        session.post = MagicMock(
+            side_effect=_with_token_endpoint(_make_mock_response(403, {}))
+        )
         api = _make_api(session)
-        api.restore_tokens("token", "refresh", time.time() + 3600)
 
         with pytest.raises(VeluxActiveAuthError):
             await api.async_get_homes_data()
+
+        assert session.post.call_count == 2
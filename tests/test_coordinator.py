@@ -0,0 +1,209 @@
+"""Tests for the Velux ACTIVE data update coordinator."""
+from __future__ import annotations
+
+import asyncio
+import copy
+from collections.abc import AsyncIterator
+from pathlib import Path
+from typing import Any
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import aiohttp
+import pytest
+
+from homeassistant.core import HomeAssistant
+from homeassistant.exceptions import ConfigEntryAuthFailed
+
+from custom_components.velux_active.api import (
+    VeluxActiveAuthError,
+    VeluxActiveConnectionError,
+)
+from custom_components.velux_active.coordinator import (
+    VeluxActiveCoordinator,
+    _call_with_retry,
+)
+from tests.conftest import MOCK_HOME_ID, MOCK_HOME_STATUS, MOCK_HOMES_DATA
+
+
+@pytest.fixture
+async def hass(tmp_path: Path) -> AsyncIterator[HomeAssistant]:
+    """Return a running Home Assistant instance with mocked config entries."""
+    hass = HomeAssistant(str(tmp_path))
+    hass.config_entries = MagicMock()
+    await hass.async_start()
+    yield hass
+    await hass.async_stop(force=True)
+
+
+@pytest.fixture
+def api() -> MagicMock:
+    """Return a mock API client whose tokens start out persisted."""
+    api = MagicMock()
+    api.tokens_dirty = False
+    api.async_close = AsyncMock()
+    api.async_get_homes_data = AsyncMock(return_value=MOCK_HOMES_DATA)
+    # The coordinator mutates the status, so every poll gets a fresh copy
+    api.async_get_home_status = AsyncMock(
+        side_effect=lambda home_id: copy.deepcopy(MOCK_HOME_STATUS)
+    )
+
+    def _mark_tokens_persisted() -> None:
+        api.tokens_dirty = False
+
+    api.mark_tokens_persisted.side_effect = _mark_tokens_persisted
+    return api
+
+
+@pytest.fixture
+def coordinator(hass: HomeAssistant, api: MagicMock) -> VeluxActiveCoordinator:
+    """Return a coordinator attached to a mock config entry."""
+    with patch("custom_components.velux_active.coordinator.TOKEN_PERSIST_DELAY", 0.01):
+        coordinator = VeluxActiveCoordinator(hass, api, MOCK_HOME_ID)
+    coordinator.config_entry = MagicMock(data={"home_id": MOCK_HOME_ID})
+    return coordinator
+
+
+class TestTokenPersistence:
+    """Tests for writing refreshed tokens back to the config entry."""
+
+    async def test_dirty_tokens_are_written_once_after_debounce(
+        self, hass: HomeAssistant, api: MagicMock, coordinator: VeluxActiveCoordinator
+    ) -> None:
+        """Test that several polls with new tokens cause a single write."""
+        api.tokens_dirty = True
+        await coordinator._async_update_data()
+        await coordinator._async_update_data()
+
+        assert not hass.config_entries.async_update_entry.called
+
+        await asyncio.sleep(0.05)
+        await hass.async_block_till_done()
+
+        hass.config_entries.async_update_entry.assert_called_once()
+        data = hass.config_entries.async_update_entry.call_args[1]["data"]
+        assert data["token_data"]["access_token"] is api.access_token
+
+    async def test_pending_tokens_are_flushed_on_shutdown(
+        self, hass: HomeAssistant, api: MagicMock, coordinator: VeluxActiveCoordinator
+    ) -> None:
+        """Test that shutting down writes tokens still waiting for the debounce."""
+        api.tokens_dirty = True
+        await coordinator._async_update_data()
+
+        await coordinator.async_shutdown()
+        await asyncio.sleep(0.05)
+        await hass.async_block_till_done()
+
+        hass.config_entries.async_update_entry.assert_called_once()
+
+    async def test_clean_tokens_are_not_written(
+        self, hass: HomeAssistant, coordinator: VeluxActiveCoordinator
+    ) -> None:
+        """Test that polls without token changes never touch the entry."""
+        await coordinator._async_update_data()
+        await coordinator.async_shutdown()
+
+        assert not hass.config_entries.async_update_entry.called
+
+
+class TestNamesRefresh:
+    """Tests for refetching homesdata names."""
+
+    async def test_unchanged_modules_do_not_refetch_names(
+        self, api: MagicMock, coordinator: VeluxActiveCoordinator
+    ) -> None:
+        """Test that homesdata is fetched once while the module set is stable."""
+        await coordinator._async_update_data()
+        await coordinator._async_update_data()
+
+        assert api.async_get_homes_data.call_count == 1
+
+    async def test_changed_modules_refetch_names(
+        self, api: MagicMock, coordinator: VeluxActiveCoordinator
+    ) -> None:
+        """Test that a newly paired module triggers a homesdata refetch."""
+        await coordinator._async_update_data()
+
+        status = copy.deepcopy(MOCK_HOME_STATUS)
+        status["body"]["home"]["modules"].append({"id": "new_module"})
+        api.async_get_home_status.side_effect = None
+        api.async_get_home_status.return_value = status
+        await coordinator._async_update_data()
+
+        assert api.async_get_homes_data.call_count == 2
+
+    async def test_failed_status_cancels_names_fetch(
+        self, api: MagicMock, coordinator: VeluxActiveCoordinator
+    ) -> None:
+        """Test that a failed poll does not leave the names fetch running."""
+        started = asyncio.Event()
+        cancelled = asyncio.Event()
+
+        async def _slow_homes_data() -> dict[str, Any]:
+            started.set()
+            try:
+                await asyncio.Event().wait()
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+            return MOCK_HOMES_DATA
+
+        async def _failing_status(home_id: str) -> dict[str, Any]:
+            await started.wait()
+            raise VeluxActiveAuthError("denied")
+
+        api.async_get_homes_data.side_effect = _slow_homes_data
+        api.async_get_home_status.side_effect = _failing_status
+
+        with pytest.raises(ConfigEntryAuthFailed):
+            await coordinator._async_update_data()
+        await asyncio.sleep(0)
+
+        assert cancelled.is_set()
+
+
+class TestRetry:
+    """Tests for retrying transient homestatus failures."""
+
+    async def test_retry_stops_after_three_attempts(self) -> None:
+        """Test that connection errors are retried up to the attempt limit."""
+        factory = AsyncMock(side_effect=VeluxActiveConnectionError("timeout"))
+
+        with pytest.raises(VeluxActiveConnectionError):
+            await _call_with_retry(factory, base=0)
+
+        assert factory.call_count == 3
+
+    async def test_auth_errors_are_not_retried(self) -> None:
+        """Test that authentication errors propagate immediately."""
+        factory = AsyncMock(side_effect=VeluxActiveAuthError("denied"))
+
+        with pytest.raises(VeluxActiveAuthError):
+            await _call_with_retry(factory, base=0)
+
+        assert factory.call_count == 1
+
+    @pytest.mark.parametrize(
+        ("status", "calls"),
+        [
+            pytest.param(429, 1, id="client_error"),
+            pytest.param(503, 3, id="server_error"),
+        ],
+    )
+    async def test_only_server_errors_are_retried(
+        self, status: int, calls: int
+    ) -> None:
+        """Test that 4xx responses are not retried but 5xx responses are."""
+
+        async def _fail() -> Any:
+            try:
+                raise aiohttp.ClientResponseError(MagicMock(), (), status=status)
+            except aiohttp.ClientResponseError as err:
+                raise VeluxActiveConnectionError(f"status {status}") from err
+
+        factory = AsyncMock(side_effect=_fail)
+
+        with pytest.raises(VeluxActiveConnectionError):
+            await _call_with_retry(factory, base=0)
+
+        assert factory.call_count == calls